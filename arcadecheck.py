@@ -0,0 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import config
+from mamecheck import MameChecker
+from launchboxcheck import LaunchboxChecker
+from retroarchcheck import RetroarchChecker
+from ledblinkycheck import LedBlinkyChecker
+from scummvmcheck import ScummvmChecker
+
+# Checks run by default. One process shares imports and the HTTP session between them
+CHECKERS = {
+    "mame": (MameChecker, config.MAME),
+    "launchbox": (LaunchboxChecker, config.LAUNCHBOX),
+    "retroarch": (RetroarchChecker, config.RETROARCH),
+    "ledblinky": (LedBlinkyChecker, config.LEDBLINKY),
+    "scummvm": (ScummvmChecker, config.SCUMMVM),
+}
+
+
+def main(names):
+    """Run the named checks, or all of them
+    Args:
+        names (list): Keys of CHECKERS to run, empty runs every check
+    Returns:
+        int: Process exit status, non-zero when any check failed
+    """
+    unknown = [name for name in names if name not in CHECKERS]
+    if unknown:
+        print(f"Unknown check {', '.join(unknown)}, choose from {', '.join(CHECKERS)}", file=sys.stderr)
+        return 2
+    checkers = [checker_class(cfg) for checker_class, cfg in (CHECKERS[name] for name in names or CHECKERS)]
+    # Checks spend their time waiting on the network, run them side by side so a run takes as long as the slowest site
+    with ThreadPoolExecutor(max_workers=len(checkers)) as pool:
+        statuses = list(pool.map(lambda checker: checker.run(), checkers))
+    status = 0
+    for result in statuses:
+        status |= result
+    return status
+
+
+if __name__ == '__main__':
+    config.setup_logging()
+    sys.exit(main(sys.argv[1:]))
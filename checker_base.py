@@ -0,0 +1,307 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import pushover
+import atexit
+import hashlib
+import queue
+import threading
+import logging
+import json
+import os
+import re
+import time
+import config
+import datafiles
+
+log = logging.getLogger("arcadecheck")
+
+# What a published version looks like, e.g. 1.16.0
+_VERSION_RE = re.compile(r"\d+(?:\.\d+)+")
+
+# urllib3 only decodes brotli responses when the brotli module is installed, only ask for it then
+try:
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = "br, gzip, deflate"
+except ImportError:
+    _ACCEPT_ENCODING = "gzip, deflate"
+
+# Reuse one pooled keep-alive session for every request the checkers make,
+# retrying connection hiccups with a short backoff before a check is failed.
+# Every checked site is its own host, keep a pool per host so concurrent checks don't evict each other
+session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=Retry(total=3, backoff_factor=0.3))
+session.mount("https://", _adapter)
+session.mount("http://", _adapter)
+session.headers.update({"User-Agent": "arcade_app_alerter", "Accept-Encoding": _ACCEPT_ENCODING})
+
+# Pushover messages are posted by a background thread so checks never wait on them
+_notify_queue = queue.Queue()
+_notify_lock = threading.Lock()
+_notify_thread = None
+
+
+def _read_notify_state():
+    try:
+        with open(config.NOTIFY_STATE_FILE, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _notify_worker():
+    # Only this thread touches the notify state, so reading, checking and rewriting it needs no lock
+    client = None
+    state = None
+    while True:
+        message, title = _notify_queue.get()
+        try:
+            if state is None:
+                state = _read_notify_state()
+            key = hashlib.blake2b(f"{title}\0{message}".encode(), digest_size=8).hexdigest()
+            now = time.time()
+            if now - state.get(key, 0) < config.NOTIFY_REPEAT_WINDOW:
+                # Same failure on consecutive runs, the user already has this one
+                log.info(f"Pushover notification '{title}' already sent recently, not sending again")
+                continue
+            if client is None:
+                # The credentials are only read once there is actually something to send
+                client = pushover.PushoverClient(config.PUSHOVER_CREDS)
+            client.send_message(message, title=title)
+            state = {k: sent for k, sent in state.items() if now - sent < config.NOTIFY_REPEAT_WINDOW}
+            state[key] = now
+            datafiles.ensure_dir(config.DATA_DIR)
+            datafiles.atomic_write_lines(config.NOTIFY_STATE_FILE, [json.dumps(state)])
+        except Exception as e:
+            log.error(f"Pushover notification '{title}' failed: {e}")
+        finally:
+            _notify_queue.task_done()
+
+
+def queue_notification(message, title):
+    """Hand a Pushover message to the background sender, starting it on first use"""
+    global _notify_thread
+    with _notify_lock:
+        if _notify_thread is None:
+            _notify_thread = threading.Thread(target=_notify_worker, name="pushover", daemon=True)
+            _notify_thread.start()
+            # Daemon threads still run during atexit, let queued messages go out before exit
+            atexit.register(_notify_queue.join)
+    _notify_queue.put((message, title))
+
+
+class VersionChecker:
+    """Compare an app's published version with the local one and send a Pushover alert when it changes
+
+    Subclasses implement parse() to pull the published version out of the downloaded page.
+    """
+    __slots__ = ("cfg", "checked_file", "http_cache", "http_cache_file", "now_str", "now_ts", "pending_writes")
+
+    # Send the last response's ETag/Last-Modified back as a conditional GET
+    conditional = False
+    # Leave the body on the wire so read_body() can stop downloading early
+    stream = False
+    # Stop downloading once this many bytes have arrived, None reads the whole page
+    max_bytes = None
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.http_cache_file = f"{os.path.splitext(cfg.version_file)[0]}.http"
+        # Unix time of this app's last completed check, see checked_recently()
+        self.checked_file = f"{os.path.splitext(cfg.version_file)[0]}.checked"
+        # Validators of the last good response, loaded by fetch() for conditional checkers
+        self.http_cache = {}
+        # Data file updates are queued here and written together by flush_writes()
+        self.pending_writes = {}
+        tm = time.localtime()
+        self.now_str = f"{tm.tm_mon:02d}-{tm.tm_mday:02d}-{tm.tm_year}"
+        self.now_ts = f"{self.now_str} {tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}"
+
+    def read_local_version(self):
+        try:
+            with open(self.cfg.version_file, "r") as file:
+                return file.readline().strip()
+        except FileNotFoundError:
+            # Nothing recorded yet, the first successful check writes the version
+            return None
+
+    def write_local_version(self, version):
+        self.pending_writes[self.cfg.version_file] = [version, self.now_str]
+
+    def update_lastcheck(self):
+        self.pending_writes[config.LASTCHECK_FILE] = [self.now_ts, self.cfg.label]
+        self.pending_writes[self.checked_file] = [int(time.time())]
+
+    def flush_writes(self):
+        datafiles.ensure_dir(config.DATA_DIR)
+        # The validators go last. Written ahead of a version file that then fails, the next run would
+        # get a 304 and report the old version as current, losing the update alert
+        http_cache = self.pending_writes.pop(self.http_cache_file, None)
+        try:
+            for path, lines in self.pending_writes.items():
+                datafiles.atomic_write_lines(path, lines)
+            if http_cache is not None:
+                datafiles.atomic_write_lines(self.http_cache_file, http_cache)
+        finally:
+            self.pending_writes.clear()
+
+    def checked_recently(self):
+        # Each app keeps its own check time in the file's contents, mtimes move on checkouts and copies
+        # An unreadable file just means a fresh check, run() then reports any real problem with the data dir
+        try:
+            checked = float(datafiles.read_lines(self.checked_file)[0])
+        except (OSError, IndexError, ValueError):
+            return False
+        return 0 <= time.time() - checked < config.MIN_CHECK_INTERVAL
+
+    def read_http_cache(self):
+        try:
+            with open(self.http_cache_file, "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def write_http_cache(self, response):
+        validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+        self.pending_writes[self.http_cache_file] = [json.dumps(validators)]
+
+    def fetch(self, conditional=True):
+        headers = {}
+        if self.conditional and conditional:
+            self.http_cache = http_cache = self.read_http_cache()
+            if http_cache.get("etag"):
+                headers["If-None-Match"] = http_cache["etag"]
+            if http_cache.get("last_modified"):
+                headers["If-Modified-Since"] = http_cache["last_modified"]
+        stream = self.stream or self.max_bytes is not None
+        return session.get(self.cfg.url, headers=headers, stream=stream, timeout=20)
+
+    def same_validators(self, response):
+        """Check a full response against the cached validators, for servers that ignore conditional requests
+        Args:
+            response (requests.Response): Response to a conditional GET
+        Returns:
+            bool: True when it carries the ETag, or without one the Last-Modified, of the last good response
+        """
+        if not self.conditional or response.status_code != 200:
+            return False
+        etag = response.headers.get("ETag")
+        if etag:
+            return etag == self.http_cache.get("etag")
+        last_modified = response.headers.get("Last-Modified")
+        return bool(last_modified) and last_modified == self.http_cache.get("last_modified")
+
+    def read_body(self, response):
+        if self.max_bytes is None:
+            return response.content
+        chunks = []
+        total = 0
+        with response:
+            for chunk in response.iter_content(chunk_size=8192):
+                chunks.append(chunk)
+                total += len(chunk)
+                if total >= self.max_bytes:
+                    break
+        return b"".join(chunks)
+
+    def parse(self, content):
+        """Extract the published version
+        Args:
+            content (bytes): Raw body of the app's web page
+        Returns:
+            str: Published version
+        Raises:
+            ValueError: The version could not be found in the page
+        """
+        raise NotImplementedError
+
+    def send_message(self, message, title):
+        queue_notification(message, title)
+
+    def run(self):
+        """Run one check
+        Returns:
+            int: Process exit status, 0 when the check completed
+        """
+        label = self.cfg.label
+        if self.checked_recently():
+            log.info(f"{label} was checked less than {config.MIN_CHECK_INTERVAL // 60} minutes ago, skipping")
+            return 0
+        try:
+            oldversion = self.read_local_version()
+            # Without a recorded version a 304 would leave nothing to report, always fetch the full page then
+            response = self.fetch(conditional=oldversion is not None)
+
+            if response.status_code == 304 or self.same_validators(response):
+                # Page has not changed since the last check, nothing to parse. Streamed bodies are never downloaded
+                response.close()
+                newversion = oldversion
+            else:
+                response.raise_for_status()
+                newversion = self.parse(self.read_body(response))
+                if self.conditional:
+                    self.write_http_cache(response)
+
+            changed = oldversion != newversion
+            if changed:
+                self.write_local_version(newversion)
+            self.update_lastcheck()
+            self.flush_writes()
+
+            if changed and oldversion is None:
+                log.info(f"No local {label} version yet, recorded current version {newversion}")
+            elif changed:
+                log.info(f"{label} version {oldversion} is different then current version {newversion}")
+                self.send_message(f"New {label} version update {newversion} is ready for download", title=f"New {label} Version")
+            else:
+                log.info(f"{label} Version {oldversion} is current")
+            return 0
+        except Exception as e:
+            log.error(f"{label} Check Error! Cannot determine latest version: {e}")
+            self.send_message(f"{label} Check Error! Cannot determine latest version", title=f"{label} Check Error")
+            return 1
+
+
+class PatternChecker(VersionChecker):
+    """VersionChecker for pages that state the version in one fixed sentence
+
+    Subclasses set version_re, with the version as group 1, and anchor, the literal text the pattern starts with.
+    When the sentence is reworded the version is taken from the soup_index'th soup_tag element instead.
+    """
+    __slots__ = ()
+
+    anchor = b""
+    version_re = None
+    soup_tag = None
+    soup_index = 4
+
+    def parse(self, content):
+        # Plain substring find jumps straight to the start of the sentence, the regex then only runs from there
+        match = self.version_re.search(content, max(content.find(self.anchor), 0))
+        if match:
+            return match.group(1).decode('ascii')
+        version = self.parse_soup(content)
+        # The fallback picks text by position, don't let a stray word get recorded and announced as a version
+        if not _VERSION_RE.fullmatch(version):
+            raise ValueError(f"Unexpected {self.cfg.label} version: {version}")
+        return version
+
+    def parse_soup(self, content):
+        """Fallback parse for when the sentence is reworded, raises ValueError if soup_tag is not set"""
+        if self.soup_tag is None:
+            raise ValueError(f"{self.cfg.label} version not found")
+        # bs4 is slow to import and only needed when the regex misses
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(content, 'html.parser')
+        version_elements = soup.find_all(self.soup_tag)
+        if log.isEnabledFor(logging.DEBUG):
+            for element in version_elements:
+                log.debug(element)
+        if len(version_elements) <= self.soup_index:
+            raise ValueError(f"{self.cfg.label} version element not found")
+        newvertext = version_elements[self.soup_index].get_text()
+        # Take the version number wherever the wording puts it, a fixed word index breaks on any rewording
+        match = _VERSION_RE.search(newvertext)
+        if not match:
+            raise ValueError(f"No {self.cfg.label} version number in: {newvertext.strip()}")
+        return match.group(0)
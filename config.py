@@ -0,0 +1,66 @@
+from dataclasses import dataclass
+import logging
+import os
+import sys
+import time
+
+# Settings shared by the checkers, evaluated once when first imported
+WORK_DIR = "/opt/arcade_app_alerter"
+DATA_DIR = f"{WORK_DIR}/data"
+PUSHOVER_CREDS = "/etc/pushover.creds"
+LASTCHECK_FILE = f"{DATA_DIR}/lastcheck"
+# Skip a check when the same app was checked less than this many seconds ago
+MIN_CHECK_INTERVAL = 3600
+# Hashes and send times of recent Pushover messages, an identical message within the window is not sent again
+NOTIFY_STATE_FILE = f"{DATA_DIR}/.notify_state"
+NOTIFY_REPEAT_WINDOW = 24 * 3600
+
+# Checkers log to stdout, cron appends it to LOG_FILE which webview shows the end of.
+# asctime is rendered as MM-DD-YYYY HH:MM:SS local time, see _CachedTimeFormatter
+LOG_FILE = "/var/log/arcadecheck.log"
+LOG_FORMAT = "[%(asctime)s] %(message)s"
+
+
+@dataclass(frozen=True)
+class AppConfig:
+    label: str
+    url: str
+    version_file: str
+
+
+MAME = AppConfig("MAME", "https://pleasuredome.github.io/pleasuredome/mame/index.html", f"{DATA_DIR}/mame.ver")
+LAUNCHBOX = AppConfig("Launchbox", "https://www.launchbox-app.com/about/changelog", f"{DATA_DIR}/launchbox.ver")
+RETROARCH = AppConfig("Retroarch", "https://www.retroarch.com/?page=platforms", f"{DATA_DIR}/retroarch.ver")
+LEDBLINKY = AppConfig("LedBlinky", "http://www.ledblinky.net/Download.htm", f"{DATA_DIR}/ledblinky.ver")
+SCUMMVM = AppConfig("ScummVM", "https://www.scummvm.org/downloads/", f"{DATA_DIR}/scummvm.ver")
+# In webview's display order
+APPS = (MAME, LAUNCHBOX, RETROARCH, LEDBLINKY, SCUMMVM)
+
+
+class _CachedTimeFormatter(logging.Formatter):
+    """Formatter that renders the timestamp once per second instead of once per record"""
+
+    def __init__(self, fmt):
+        super().__init__(fmt)
+        self._last_sec = None
+        self._last_str = ""
+
+    def formatTime(self, record, datefmt=None):
+        # Handlers hold their lock while formatting, so this cache needs no lock of its own
+        sec = int(record.created)
+        if sec != self._last_sec:
+            tm = time.localtime(sec)
+            self._last_str = f"{tm.tm_mon:02d}-{tm.tm_mday:02d}-{tm.tm_year} {tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}"
+            self._last_sec = sec
+        return self._last_str
+
+
+def setup_logging():
+    """Send the arcadecheck logger to stdout in the log file's line format, with debug output if ARCADE_APP_VERBOSE is set"""
+    logger = logging.getLogger("arcadecheck")
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(_CachedTimeFormatter(LOG_FORMAT))
+        logger.addHandler(handler)
+        logger.setLevel(logging.DEBUG if os.environ.get("ARCADE_APP_VERBOSE") else logging.INFO)
+    return logger
@@ -0,0 +1,57 @@
+import os
+import tempfile
+
+# Directories already created by this process
+_dirs_ready = set()
+
+
+def ensure_dir(path):
+    """Create a directory once per process, later calls cost nothing"""
+    if path in _dirs_ready:
+        return
+    os.makedirs(path, exist_ok=True)
+    _dirs_ready.add(path)
+
+
+def read_lines(path):
+    """Read a data file
+    Args:
+        path (str): Path of the data file
+    Returns:
+        list: Stripped lines of the file, empty if the file does not exist
+    """
+    try:
+        with open(path, "r") as file:
+            return [line.strip() for line in file]
+    except FileNotFoundError:
+        return []
+
+
+def atomic_write_lines(path, lines):
+    """Replace a data file with the given lines without ever leaving it half written
+    Args:
+        path (str): Path of the data file
+        lines (list): Lines to write, without trailing newlines
+    """
+    lines = [str(line) for line in lines]
+    if read_lines(path) == lines:
+        # Nothing changed, leave the file alone
+        return
+    data = "".join(f"{line}\n" for line in lines).encode()
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".", suffix=".tmp")
+    try:
+        # Data files are a few bytes, write straight to the descriptor instead of through a file object
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            # mkstemp creates the file owner-only, keep data files readable by webview
+            os.fchmod(fd, 0o644)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp, path)
+    except BaseException:
+        # Don't leave a stray temp file behind in the data directory
+        os.unlink(tmp)
+        raise
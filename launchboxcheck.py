@@ -1,61 +1,72 @@
-import requests
-from bs4 import BeautifulSoup
-import pushover
-import datetime
-
-# Define the URL of the webpage you want to scrape
-url = 'https://pleasuredome.github.io/pleasuredome/mame/index.html'
-client = pushover.PushoverClient("/etc/pushover.creds")
-work_dir = "/opt/arcade_app_alerter"
-
-now = datetime.datetime.now()
-now_str = now.strftime("%m-%d-%Y")
-now_ts = now.strftime("%m-%d-%Y %H:%M:%S")
-
-with open(f"{work_dir}/data/launchbox.ver", "r") as file:
-    oldversion = file.readlines()[0].strip()
-
-# Send a GET request to the webpage
-url = 'https://www.launchbox-app.com/about/changelog'
-try:
-    response = requests.get(url)
-
-    # Parse the HTML content using BeautifulSoup
-    soup = BeautifulSoup(response.content, 'html.parser')
-
-    # Find the elements containing version numbers
-    version_elements = soup.find_all('h4')
-    # Extract the version numbers
-    version_numbers = []
-
-    for element in version_elements:
-        version_number = element.text.strip()
-        version_numbers.append(version_number)
-
-    v1split = version_numbers[0].split(" ")
-    v2split = version_numbers[1].split(" ")
-
-    if v1split[4] == "?":
-        newversion = v2split[1]
-        #print(f"Beta Version: {v1split[1]}")
-        #print(f"Release Version: {v2split[1]}")
-    else:
-        newversion = v1split[1]
-        #print(f"Release Version: {v1split[1]}")
-
-    with open(f"{work_dir}/data/lastcheck", "w") as file:
-        file.write(f"{now_ts}\n")
-        file.write("Launchbox\n")
-
-    if oldversion != newversion:
-        print(f"[{now_ts}] Launchbox version {oldversion} is different then current version {newversion}")
-        with open(f"{work_dir}/data/launchbox.ver", "w") as file:
-            file.write(f"{newversion}\n")
-            file.write(f"{now_str}\n")
-        client.send_message(f"New Launchbox version {newversion} is ready for download", title="New Launchbox Version")
-    else:
-        print(f"[{now_ts}] Launchbox Version {oldversion} is current")
-except:
-    print(f"[{now_ts}] Launchbox Check Error! Cannot determine latest version")
-    client.send_message("Launchbox Check Error! Cannot determine latest version", title="Launchbox Check Error")
+import html
+import re
+import sys
+import config
+from checker_base import VersionChecker
 
+# Changelog headings hold the version numbers, scanned straight from the raw bytes
+_H4_RE = re.compile(rb'<h4[^>]*>(.*?)</h4>', re.IGNORECASE | re.DOTALL)
+_H4_OPEN_RE = re.compile(rb'<h4', re.IGNORECASE)
+_TAG_RE = re.compile(rb'<[^>]+>')
+_WS_RE = re.compile(r'\s+')
+_VERSION_RE = re.compile(r'\d+(?:\.\d+)+')
+
+
+class LaunchboxChecker(VersionChecker):
+    __slots__ = ("found_version",)
+    conditional = True
+    stream = True
+
+    def __init__(self, cfg):
+        super().__init__(cfg)
+        # Set by read_body() when the streamed scan finds the release, parse() then has nothing left to do
+        self.found_version = None
+
+    def read_body(self, response):
+        # Only the newest entries matter, stop downloading once a released version has arrived
+        body = bytearray()
+        pos = 0
+        with response:
+            for chunk in response.iter_content(chunk_size=8192):
+                body += chunk
+                # Headings already scanned are never looked at again, only the new bytes are
+                self.found_version, pos = self._release_version(body, pos)
+                if self.found_version:
+                    break
+        return bytes(body)
+
+    def _release_version(self, content, pos=0):
+        """Scan changelog headings for the newest released version
+        Args:
+            content (bytes): Changelog page, possibly only the first part of it
+            pos (int): Offset to resume scanning from
+        Returns:
+            tuple: Released version or None, and the offset to resume from once more of the page has arrived
+        """
+        # Headings run newest first, stop at the first one that is not an unreleased beta
+        for match in _H4_RE.finditer(content, pos):
+            pos = match.end()
+            heading = _TAG_RE.sub(b'', match.group(1)).decode('utf-8', 'replace')
+            heading = _WS_RE.sub(' ', html.unescape(heading)).strip()
+            words = heading.split(" ")
+            if len(words) > 4 and words[4] == "?":
+                continue
+            if len(words) < 2 or not _VERSION_RE.fullmatch(words[1]):
+                raise ValueError(f"Unexpected changelog heading: {heading}")
+            return words[1], pos
+        # No further complete heading, resume at one still arriving, or just short of the end so a split "<h4" is seen
+        pending = _H4_OPEN_RE.search(content, pos)
+        return None, pending.start() if pending else max(pos, len(content) - 3)
+
+    def parse(self, content):
+        version = self.found_version
+        if version is None:
+            version = self._release_version(content)[0]
+        if version is None:
+            raise ValueError("No released version found in changelog")
+        return version
+
+
+if __name__ == '__main__':
+    config.setup_logging()
+    sys.exit(LaunchboxChecker(config.LAUNCHBOX).run())
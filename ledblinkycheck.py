@@ -1,56 +1,40 @@
-import requests
 import re
-from bs4 import BeautifulSoup
-import pushover
-import transmissionrpc
-import datetime
+import sys
+import config
+from checker_base import VersionChecker
 
-# Define the URL of the webpage you want to scrape
-url = 'http://www.ledblinky.net/Download.htm'
-client = pushover.PushoverClient("/etc/pushover.creds")
-work_dir = "/opt/arcade_app_alerter"
+_HREF_RE = re.compile(rb"<a\s[^>]*?href\s*=\s*[\"']([^\"']+)[\"']", re.IGNORECASE)
 
-now = datetime.datetime.now()
-now_str = now.strftime("%m-%d-%Y")
-now_ts = now.strftime("%m-%d-%Y %H:%M:%S")
 
-with open(f"{work_dir}/data/ledblinky.ver", "r") as file:
-    oldversion = file.readlines()[0].strip()
+class LedBlinkyChecker(VersionChecker):
+    __slots__ = ()
+    conditional = True
+    # The version is near the top of the page, no need for the rest
+    max_bytes = 128 * 1024
 
-try:
-    # Send a GET request to the URL and retrieve the content
-    response = requests.get(url)
-    content = response.content
+    def parse(self, content):
+        # The first download link is named after the release, e.g. LEDBlinky_8_2_1...
+        match = _HREF_RE.search(content)
+        if match:
+            href = match.group(1).decode('utf-8', 'replace')
+        else:
+            href = self.parse_soup(content)
+        versions = href.split('_')
+        maj_ver = versions[1]
+        min_ver = versions[2]
+        pat_ver = versions[3]
+        return f'{maj_ver}.{min_ver}.{pat_ver}'
 
-    # Create a BeautifulSoup object to parse the content
-    soup = BeautifulSoup(content, 'html.parser')
-    link_tags = soup.find_all('a', href=True)
-    links = [link['href'] for link in link_tags]
-    versions = links[0].split('_')
-    maj_ver = versions[1]
-    min_ver = versions[2]
-    pat_ver = versions[3]
-    newversion = f'{maj_ver}.{min_ver}.{pat_ver}'
+    def parse_soup(self, content):
+        from bs4 import BeautifulSoup, SoupStrainer
+        # Only anchors are needed, skip building the rest of the page
+        soup = BeautifulSoup(content, 'lxml', parse_only=SoupStrainer('a', href=True))
+        link = soup.find('a', href=True)
+        if link is None:
+            raise ValueError("No download link found")
+        return link['href']
 
-    with open(f"{work_dir}/data/lastcheck", "w") as file:
-        file.write(f"{now_ts}\n")
-        file.write("LedBlinky\n")
 
-    if oldversion != newversion:
-        print(f"[{now_ts}] LEDBlinky version {oldversion} is different then current version {newversion}")
-        with open(f"{work_dir}/data/ledblinky.ver", "w") as file:
-            file.write(f"{newversion}\n")
-            file.write(f"{now_str}\n")
-            client.send_message(f"New LEDBlinky version update {newversion} is ready for download", title="New LEDBlinky Version")
-            #try:
-            #    tc = transmissionrpc.Client('192.168.199.8', port='9091')
-            #    tc.authenticate('ip', 'Ifa6wasa9')
-                #tc.add_torrent(update_roms_link)
-            #    tc.close()
-            #except:
-            #    client.send_message(f"Error sending version {version2} downloads to transmission server", title="LEDBlinky Download Error")
-    else:
-        print(f"[{now_ts}] LEDBlinky Version {oldversion} is current")
-except:
-    print(f"[{now_ts}] LedBlinky Check Error! Cannot determine latest version")
-    client.send_message(f"LedBlinky Check Error! Cannot determine latest version", title="LedBlinky Check Error")
+if __name__ == '__main__':
+    config.setup_logging()
+    sys.exit(LedBlinkyChecker(config.LEDBLINKY).run())
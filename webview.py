@@ -1,27 +1,66 @@
 from flask import Flask, request, render_template
+from flask.helpers import get_debug_flag
+from markupsafe import escape
 from datetime import datetime
-import subprocess
+from typing import NamedTuple
+import hashlib
+import os
+import time
+import config
 
 app = Flask(__name__)
-ALLOWED_HOST = "192.168.199.5"
+# Addresses allowed to view the page
+ALLOWED_HOSTS = frozenset({"192.168.199.5"})
+LOG_LINES = 20
+# Seconds a rendered page is reused, elapsed times on it are at most this stale
+PAGE_TTL = 30
+# Rows of the version table as (label, version file), resolved from config once at import
+APPS = tuple((cfg.label, cfg.version_file) for cfg in config.APPS)
+
+class AppRow(NamedTuple):
+    """One row of the version table, empty strings where the data file has nothing"""
+    label: str
+    version: str
+    date: str
+    elapsed: str
+
+# Resolved once, render_template() would look it up and stat it on every request
+INDEX_TEMPLATE = app.jinja_env.get_template('index.html')
+
+# Files whose mtimes decide whether the cached page is still current
+TRACKED_FILES = (config.LASTCHECK_FILE, config.LOG_FILE, *(path for _, path in APPS))
+
+# Data file contents by path, as (st_mtime_ns, lines), reused until the checker rewrites the file
+_data_cache = {}
+# Rendered index page as (etag, html), the etag changes with the tracked files' mtimes and every PAGE_TTL seconds
+_page_cache = None
 
 from datetime import datetime, timedelta
 
-def elapsed_time(start_time, withsecs, append=None):
+# Largest first, elapsed_time() shows the first two that are non-zero
+_UNITS = ("Year", "Month", "Week", "Day", "Hour", "Minute", "Second")
+
+def elapsed_time(start_time, withsecs, append=None, now=None):
     """Convert string representation of datetime to elapsed time string representation
     Args:
         start_time (str): Start time in the format 'MM-DD-YYYY HH:MM'
         withsecs (bool, optional): Whether to include seconds in the elapsed time. Default is True.
         append (str, optional): String to append to the end of the elapsed time. Default is None.
+        now (float, optional): Current time as a Unix timestamp, read from the clock when not given.
     Returns:
         str: Elapsed time string representation with a maximum of 2 values, e.g. '1 Hour, 45 Minutes'
     """
-    if withsecs:
-        datetime_format = '%m-%d-%Y %H:%M:%S'
-    else:
-        datetime_format = '%m-%d-%Y'
-    start_time = datetime.strptime(start_time, datetime_format)
-    current_time = datetime.now()
+    current_time = datetime.now() if now is None else datetime.fromtimestamp(now)
+    # The data files always use MM-DD-YYYY[ HH:MM:SS], slicing the fields is much cheaper than strptime
+    try:
+        month, day, year = int(start_time[0:2]), int(start_time[3:5]), int(start_time[6:10])
+        if withsecs:
+            start_time = datetime(year, month, day, int(start_time[11:13]), int(start_time[14:16]), int(start_time[17:19]))
+        else:
+            start_time = datetime(year, month, day)
+    except ValueError:
+        # Hand edited file without zero padding, strptime still accepts it
+        start_time = datetime.strptime(start_time, '%m-%d-%Y %H:%M:%S' if withsecs else '%m-%d-%Y')
 
     if not withsecs:
         # Check if the date only of start_time is the same as current_time
@@ -31,82 +70,192 @@ def elapsed_time(start_time, withsecs, append=None):
         elif start_time.date() == current_time.date() - timedelta(days=1):
             return "Yesterday"
 
-    seconds = int((current_time - start_time).total_seconds())
-    intervals = (
-        ('Years', 31536000),
-        ('Months', 2592000),
-        ('Weeks', 604800),
-        ('Days', 86400),
-        ('Hours', 3600),
-        ('Minutes', 60),
-        ('Seconds', 1)
-    )
+    # A timestamp slightly ahead of this clock counts as just now rather than a negative age
+    seconds = max(0, int((current_time - start_time).total_seconds()))
+    years, seconds = divmod(seconds, 31536000)
+    months, seconds = divmod(seconds, 2592000)
+    weeks, seconds = divmod(seconds, 604800)
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
     result = []
-    for name, count in intervals:
-        value = seconds // count
+    for name, value in zip(_UNITS, (years, months, weeks, days, hours, minutes, seconds)):
         if value:
-            seconds -= value * count
-            if value == 1:
-                name = name.rstrip("s")
-            result.append(f"{int(value)} {name}")
+            result.append(f"{value} {name}" if value == 1 else f"{value} {name}s")
             if len(result) == 2:
                 break
+    if not result:
+        result.append("0 Seconds")
     if append:
         return ", ".join(result) + f" {append}"
     else:
         return ", ".join(result)
 
+def tail_bytes(path, count):
+    """Read the last lines of a file by reading backwards from the end, like tail -n
+    Args:
+        path (str): Path of the file
+        count (int): Number of lines to return
+    Returns:
+        bytes: The last count lines exactly as stored, empty if the file does not exist
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return b""
+    try:
+        offset = os.fstat(fd).st_size
+        chunks = []
+        newlines = 0
+        # The first read usually holds every line wanted, later ones double so long lines need few syscalls
+        chunk_size = 8192
+        # One more newline than lines wanted guarantees the first kept line is complete
+        while offset > 0 and newlines <= count:
+            size = min(chunk_size, offset)
+            offset -= size
+            chunk = os.pread(fd, size, offset)
+            chunks.append(chunk)
+            newlines += chunk.count(b"\n")
+            chunk_size = min(chunk_size * 2, 131072)
+    finally:
+        os.close(fd)
+    data = b"".join(reversed(chunks))
+    # Walk back over count line breaks, the newline ending the file doesn't start a line
+    start = len(data) - 1 if data.endswith(b"\n") else len(data)
+    for _ in range(count):
+        start = data.rfind(b"\n", 0, start)
+        if start < 0:
+            break
+    return data[start + 1:]
+
+def tail_lines(path, count):
+    """Read the last lines of a file as text, like tail -n
+    Args:
+        path (str): Path of the file
+        count (int): Number of lines to return
+    Returns:
+        str: The last count lines, newline terminated, empty if the file does not exist
+    """
+    lines = tail_bytes(path, count).decode("utf-8", "replace").splitlines()[-count:]
+    return "".join(f"{line}\n" for line in lines)
+
+def read_data_file(path, mtime):
+    """Read the two lines of a data file, only touching the file again once its mtime changes
+    Args:
+        path (str): Path of the .ver or lastcheck file
+        mtime (int): st_mtime_ns of the file from file_mtime(), 0 if it does not exist
+    Returns:
+        tuple: First and second line stripped, empty strings for missing lines or a missing file
+    """
+    if not mtime:
+        return "", ""
+    cached = _data_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    # Data files are a few bytes, one read on the raw descriptor gets both lines without a buffered text file
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        data = os.read(fd, 4096)
+    finally:
+        os.close(fd)
+    first, _, rest = data.partition(b"\n")
+    second = rest.partition(b"\n")[0]
+    lines = (first.decode("utf-8", "replace").strip(), second.decode("utf-8", "replace").strip())
+    _data_cache[path] = (mtime, lines)
+    return lines
+
+def file_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+# /health is answered before Flask builds a request context or runs limit_remote_addr, so any host may call it.
+# It only ever returns "ok" and exposes nothing from the data files or the log
+_HEALTH_HEADERS = [("Content-Type", "text/plain"), ("Content-Length", "2")]
+_flask_wsgi_app = app.wsgi_app
+
+def health_wsgi_app(environ, start_response):
+    if environ.get("PATH_INFO") == "/health":
+        start_response("200 OK", _HEALTH_HEADERS)
+        return [b"ok"]
+    return _flask_wsgi_app(environ, start_response)
+
+app.wsgi_app = health_wsgi_app
+
 @app.before_request
 def limit_remote_addr():
-    if request.remote_addr != ALLOWED_HOST:
+    if request.remote_addr not in ALLOWED_HOSTS:
         return "You're not allowed to access this resource", 403
 
 @app.route('/')
 def index():
-    # Read values from text files
-    file0_path = './data/lastcheck'
-    file1_path = './data/mame.ver'
-    file2_path = './data/launchbox.ver'
-    file3_path = './data/retroarch.ver'
-    file4_path = './data/ledblinky.ver'
-
-    
-    with open(file1_path, 'r') as file1:
-        file1_contents = file1.readlines()
-        mamever = file1_contents[0]
-        mamedate = file1_contents[1]
-        mameelapsed = elapsed_time(file1_contents[1].strip(), withsecs=False, append="ago")
-
-    with open(file2_path, 'r') as file2:
-        file2_contents = file2.readlines()
-        launchboxver = file2_contents[0]
-        launchboxdate = file2_contents[1]
-        launchboxelapsed = elapsed_time(file2_contents[1].strip(), withsecs=False, append="ago")
-
-    with open(file3_path, 'r') as file3:
-        file3_contents = file3.readlines()
-        retroarchver = file3_contents[0]
-        retroarchdate = file3_contents[1]
-        retroarchelapsed = elapsed_time(file3_contents[1].strip(), withsecs=False, append="ago")
-
-    with open(file4_path, 'r') as file4:
-        file4_contents = file4.readlines()
-        ledblinkyver = file4_contents[0]
-        ledblinkydate = file4_contents[1]
-        ledblinkyelapsed = elapsed_time(file4_contents[1].strip(), withsecs=False, append="ago")
-
-    with open(file0_path, 'r') as file0:
-        file0_contents = file0.readlines()
-        lastcheckdate = file0_contents[0]
-        lastcheckapp = file0_contents[1]
-        lastcheckelapsed = elapsed_time(file0_contents[0].strip(), withsecs=True, append="ago")
-
-    result = subprocess.check_output(['tail', '-n', '20', '/var/log/arcadecheck.log'])
-    result = result.decode('utf-8')
+    global _page_cache
+    # Any checker run touches lastcheck and the log, so the page is rendered again as soon as there is something new.
+    # Each file is stat'ed once per request, the same mtimes decide which data files need reading
+    mtimes = {path: file_mtime(path) for path in TRACKED_FILES}
+    # Elapsed times move on with the clock, so the tag also changes every PAGE_TTL seconds
+    # One clock read per request, shared by the tag and every elapsed time on the page
+    now = time.time()
+    state = (tuple(mtimes.values()), int(now) // PAGE_TTL)
+    etag = hashlib.blake2b(repr(state).encode(), digest_size=8).hexdigest()
+    if etag in request.if_none_match:
+        # The browser already shows this exact page
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+
+    cached = _page_cache
+    if cached is None or cached[0] != etag or app.debug:
+        cached = _page_cache = (etag, render_index(mtimes, now))
+    response = app.response_class(cached[1], mimetype='text/html')
+    response.set_etag(etag)
+    return response
+
+def render_index(mtimes, now):
+    """Render the index page from the data files and log
+    Args:
+        mtimes (dict): st_mtime_ns of each of TRACKED_FILES, as from file_mtime()
+        now (float): Current time as a Unix timestamp
+    Returns:
+        str: The page html
+    """
+    apps = []
+    for label, path in APPS:
+        version, date = read_data_file(path, mtimes[path])
+        elapsed = elapsed_time(date, withsecs=False, append="ago", now=now) if date else ""
+        apps.append(AppRow(label, version, date, elapsed))
+
+    lastcheckdate, lastcheckapp = read_data_file(config.LASTCHECK_FILE, mtimes[config.LASTCHECK_FILE])
+    lastcheckelapsed = elapsed_time(lastcheckdate, withsecs=True, append="ago", now=now) if lastcheckdate else ""
+
+    # Escaped here in one pass, the template then emits it as is
+    result = escape(tail_lines(config.LOG_FILE, LOG_LINES))
 
     # Render the template with the values
-    return render_template('index.html', lastcheckdate=lastcheckdate, lastcheckapp=lastcheckapp, lastcheckelapsed=lastcheckelapsed, mamever=mamever, mamedate=mamedate, mameelapsed=mameelapsed, launchboxver=launchboxver, launchboxdate=launchboxdate, launchboxelapsed=launchboxelapsed, retroarchver=retroarchver, retroarchdate=retroarchdate, retroarchelapsed=retroarchelapsed, ledblinkyver=ledblinkyver, ledblinkydate=ledblinkydate, ledblinkyelapsed=ledblinkyelapsed, log=result)
+    values = dict(lastcheckdate=lastcheckdate, lastcheckapp=lastcheckapp, lastcheckelapsed=lastcheckelapsed, apps=apps, log=result)
+    if app.debug:
+        # Pick up template edits while developing
+        page = render_template('index.html', **values)
+    else:
+        page = INDEX_TEMPLATE.render(**values)
+    return page
+
+@app.route('/log')
+def log_tail():
+    # The tail bytes go out as they are on disk, nothing to decode, escape or render
+    return app.response_class(tail_bytes(config.LOG_FILE, LOG_LINES), mimetype='text/plain')
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    if get_debug_flag():
+        # Werkzeug development server with the reloader and debugger
+        app.run(host='0.0.0.0', port=5000, debug=True)
+    else:
+        try:
+            from waitress import serve
+        except ImportError:
+            # Fall back to the Werkzeug development server, never with the debugger exposed
+            app.run(host='0.0.0.0', port=5000, threaded=True)
+        else:
+            serve(app, host='0.0.0.0', port=5000, threads=4)
 